@@ -12,44 +12,250 @@ Model Details:
 Notebook Reference: finetuning-model.ipynb
 """
 
-from firebase_functions import https_fn
+from firebase_functions import https_fn, scheduler_fn
 from firebase_functions.options import set_global_options
-# Defer import firebase_admin dan sentence_transformers untuk avoid deployment timeout
-# from firebase_admin import initialize_app, storage
-# from sentence_transformers import SentenceTransformer, util
-import json
+# firebase_admin, sentence_transformers, torch, dan numpy sengaja di-import di dalam function
+# (lazy import) untuk avoid deployment timeout dan supaya request OPTIONS (CORS preflight)
+# selesai tanpa memuat library berat
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import hashlib
 import os
+import threading
+import urllib.request
+
+# Jumlah thread untuk inference. Sesuaikan dengan vCPU function (cpu=2): nilai di atas
+# jumlah vCPU justru memperlambat karena thread saling berebut core
+# Dipakai untuk torch (set_num_threads, MKL/OpenMP) dan diteruskan ke backend OpenVINO
+# (INFERENCE_NUM_THREADS) dan ONNX Runtime (intra_op_num_threads) di create_sentence_transformer
+TORCH_NUM_THREADS = int(os.environ.get("TORCH_NUM_THREADS", "2"))
+
+# Harus di-set sebelum numpy/torch di-import supaya dipakai oleh thread pool MKL/OpenMP
+os.environ.setdefault("OMP_NUM_THREADS", str(TORCH_NUM_THREADS))
+os.environ.setdefault("MKL_NUM_THREADS", str(TORCH_NUM_THREADS))
+
+import orjson
 
 # Global options
 set_global_options(max_instances=10, region="asia-southeast1")
 
-# Initialize Firebase Admin (lazy - akan di-initialize saat diperlukan)
-# initialize_app()  # Defer initialization untuk avoid deployment timeout
+# URL score_exam untuk warmer terjadwal (warm_score_exam), contoh: https://score-exam-xxxx-as.a.run.app
+SCORE_EXAM_URL = os.environ.get("SCORE_EXAM_URL")
+
+# Firebase Admin di-initialize secara lazy di load_model_from_firebase_storage (get_app/initialize_app)
 
 # Konfigurasi Firebase Storage
 # Model disimpan di Firebase Storage setelah fine-tuning di notebook
 # Path harus sama dengan yang digunakan saat upload
 MODEL_STORAGE_PATH = "models/finsmart-ai-finetuned-model"  # Path di Firebase Storage (harus sama dengan saat upload)
 LOCAL_MODEL_PATH = "/tmp/finsmart-model"  # Temporary path di Cloud Function
+# Sentinel yang ditulis setelah semua file model selesai di-download ke LOCAL_MODEL_PATH
+LOCAL_MODEL_COMPLETE_FILE = os.path.join(LOCAL_MODEL_PATH, ".complete")
+# Model yang di-bundle bersama source function (copy finsmart-ai-finetuned-model/ ke functions/)
+# Jika ada, model di-load langsung tanpa download dari Firebase Storage
+BUNDLED_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "finsmart-ai-finetuned-model")
+FALLBACK_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"  # Pre-trained model dari HuggingFace
+
+# Jumlah thread untuk download file model secara paralel dari Firebase Storage
+DOWNLOAD_MAX_WORKERS = 8
+# File model yang lebih kecil dari ini (config, tokenizer, vocab) di-download langsung ke memory
+# lalu ditulis sekali ke disk; file weights yang besar tetap di-stream ke file
+SMALL_FILE_MAX_BYTES = 1024 * 1024
+
+# Backend inference SentenceTransformer: "openvino", "onnx", atau "torch"
+# File model backend dihasilkan oleh scripts/export_model_backends.py dan di-upload bersama model torch
+# Jika file backend tidak ada di model yang di-download, model di-load dengan backend torch
+BACKEND = os.environ.get("ST_BACKEND", "openvino")
+BACKEND_MODEL_FILES = {
+    "openvino": "openvino/openvino_model_qint8_quantized.xml",  # OpenVINO static INT8
+    "onnx": "onnx/model_qint8_avx512_vnni.onnx",  # ONNX INT8 (AVX-512 VNNI)
+}
+# Folder model backend dan file weights torch. Hanya file yang dibutuhkan BACKEND yang di-download,
+# export lain (FP32, backend lain, weights torch) tidak ikut supaya cold start tetap cepat
+BACKEND_MODEL_DIRS = {backend_file.split("/")[0] for backend_file in BACKEND_MODEL_FILES.values()}
+TORCH_WEIGHT_FILES = ("model.safetensors", "pytorch_model.bin")
+
+# Set USE_BF16=1 untuk menjalankan model torch dengan bfloat16 (hanya backend torch)
+# Validasi ulang threshold calculate_final_score dengan notebook sebelum mengaktifkan
+USE_BF16 = os.environ.get("USE_BF16") == "1"
+
+# Batch size untuk model.encode. Semua teks dikirim dalam satu panggilan encode
+# supaya smart batching SentenceTransformer (sort berdasarkan panjang teks) bisa
+# meminimalkan padding di setiap batch
+ENCODE_BATCH_SIZE = 32
+
+# Jumlah maksimum embeddings yang disimpan di cache (per instance, LRU)
+EMBEDDING_CACHE_SIZE = 4096
 
 # Flag untuk track apakah model sudah di-download
 _model_loaded = False
 model = None
+# Identitas model yang sedang di-load, bagian dari key cache embeddings
+_model_version = None
+# Sumber model yang sedang di-load ("bundled", "storage", atau "fallback"), aman untuk response /warmup
+_model_source = None
+# score_exam melayani beberapa request paralel (concurrency > 1) di satu instance:
+# model hanya boleh di-load sekali, model.encode dipanggil bergantian (infer request OpenVINO/ONNX
+# tidak aman dipakai beberapa thread sekaligus), dan cache embeddings diakses bergantian
+_model_lock = threading.Lock()
+_encode_lock = threading.Lock()
+_embedding_cache_lock = threading.Lock()
+
+# Cache embeddings antar request di instance yang sama (key_answer sering dipakai ulang)
+# Key: (_model_version, SHA-256 teks), Value: normalized embedding (numpy array)
+# Sengaja exact-match saja: semantic cache (student_answer yang "mirip" memakai similarity
+# jawaban lain) tetap harus meng-encode student_answer untuk lookup, sehingga hanya menghemat
+# satu dot product, tetapi bisa mengubah nilai siswa
+_embedding_cache = OrderedDict()
+
+
+def configure_torch_threads():
+    """Set jumlah thread torch sesuai TORCH_NUM_THREADS."""
+    import torch
+
+    torch.set_num_threads(TORCH_NUM_THREADS)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Inter-op threads hanya bisa di-set sekali per process
+        pass
+
+
+def apply_bf16(model):
+    """Konversi model torch ke bfloat16 jika USE_BF16 aktif."""
+    if not USE_BF16:
+        return model
+
+    import torch
+
+    print("Using bfloat16 weights")
+    return model.to(torch.bfloat16)
+
+
+def create_sentence_transformer(model_path: str):
+    """
+    Load SentenceTransformer dari local path menggunakan BACKEND.
+    Fallback ke backend torch jika file model untuk BACKEND tidak tersedia.
+    """
+    # Import SentenceTransformer saat diperlukan (lazy import)
+    from sentence_transformers import SentenceTransformer
+
+    configure_torch_threads()
+
+    backend_file = BACKEND_MODEL_FILES.get(BACKEND)
+    if backend_file and os.path.exists(os.path.join(model_path, backend_file)):
+        print(f"Using {BACKEND} backend: {backend_file}")
+        model_kwargs = {"file_name": backend_file}
+        if BACKEND == "openvino":
+            # OpenVINO memakai thread pool sendiri (TBB), tidak terpengaruh torch/OpenMP
+            model_kwargs["ov_config"] = {"INFERENCE_NUM_THREADS": str(TORCH_NUM_THREADS)}
+        elif BACKEND == "onnx":
+            # ONNX Runtime memakai thread pool sendiri, tidak terpengaruh torch/OpenMP
+            import onnxruntime
+
+            session_options = onnxruntime.SessionOptions()
+            session_options.intra_op_num_threads = TORCH_NUM_THREADS
+            session_options.inter_op_num_threads = 1
+            model_kwargs["provider"] = "CPUExecutionProvider"
+            model_kwargs["session_options"] = session_options
+        return SentenceTransformer(model_path, backend=BACKEND, model_kwargs=model_kwargs)
+
+    if backend_file:
+        print(f"⚠️ {backend_file} tidak ditemukan, using torch backend")
+    return apply_bf16(SentenceTransformer(model_path))
+
+
+def get_relative_path(blob) -> str:
+    """Get relative path file model dari MODEL_STORAGE_PATH."""
+    return blob.name.replace(MODEL_STORAGE_PATH + "/", "")
+
+
+def is_model_file_needed(relative_path: str, backend_file: str) -> bool:
+    """
+    Cek apakah file model dibutuhkan untuk load model.
+
+    Args:
+        relative_path: Path file relatif terhadap folder model
+        backend_file: File model BACKEND (misal onnx/model_qint8_avx512_vnni.onnx),
+                      None jika model di-load dengan backend torch
+    """
+    model_dir = relative_path.split("/")[0]
+    if model_dir in BACKEND_MODEL_DIRS:
+        # Hanya file model BACKEND (misal .xml + .bin dengan nama yang sama), bukan export lain
+        if backend_file is None or model_dir != backend_file.split("/")[0]:
+            return False
+        return os.path.splitext(relative_path)[0] == os.path.splitext(backend_file)[0]
+
+    # Weights torch tidak dipakai jika model di-load dengan backend openvino/onnx
+    return backend_file is None or relative_path not in TORCH_WEIGHT_FILES
+
+
+def download_blob(blob) -> str:
+    """Download satu file model dari Firebase Storage ke LOCAL_MODEL_PATH."""
+    relative_path = get_relative_path(blob)
+    local_file_path = os.path.join(LOCAL_MODEL_PATH, relative_path)
+
+    # Create directory jika perlu
+    os.makedirs(os.path.dirname(local_file_path), exist_ok=True)
+
+    # Download file
+    if blob.size is not None and blob.size <= SMALL_FILE_MAX_BYTES:
+        data = blob.download_as_bytes()
+        with open(local_file_path, "wb") as f:
+            f.write(data)
+    else:
+        blob.download_to_filename(local_file_path)
+    return blob.name
 
 
 def load_model_from_firebase_storage():
     """
     Download model dari Firebase Storage dan load ke memory.
     Model hanya di-download sekali saat cold start.
+    Jika model di-bundle bersama source function, download dilewati.
     """
-    global model, _model_loaded
+    global model, _model_loaded, _model_version, _model_source
 
     if _model_loaded and model is not None:
         return model
 
-    print(f"Loading model from Firebase Storage: {MODEL_STORAGE_PATH}")
-
     try:
+        # Gunakan model yang di-bundle jika ada (tanpa network fetch ke Storage)
+        # Jika gagal di-load (misalnya copy tidak lengkap), lanjut download dari Storage
+        if os.path.isdir(BUNDLED_MODEL_PATH):
+            try:
+                print(f"Loading bundled model: {BUNDLED_MODEL_PATH}")
+                model = create_sentence_transformer(BUNDLED_MODEL_PATH)
+                _model_loaded = True
+                _model_version = BUNDLED_MODEL_PATH
+                _model_source = "bundled"
+                print(f"✅ Bundled model loaded successfully!")
+                return model
+            except Exception as e:
+                import traceback
+                print(f"❌ Error loading bundled model: {str(e)}")
+                print(f"Traceback: {traceback.format_exc()}")
+                print("Falling back to Firebase Storage...")
+
+        # Gunakan model di /tmp jika sudah pernah di-download lengkap di instance ini
+        # Jika gagal di-load, hapus sentinel dan download ulang dari Storage
+        if os.path.exists(LOCAL_MODEL_COMPLETE_FILE) and os.path.exists(os.path.join(LOCAL_MODEL_PATH, "config.json")):
+            try:
+                print(f"Loading cached model from: {LOCAL_MODEL_PATH}")
+                model = create_sentence_transformer(LOCAL_MODEL_PATH)
+                _model_loaded = True
+                _model_version = MODEL_STORAGE_PATH
+                _model_source = "storage"
+                print(f"✅ Cached model loaded successfully!")
+                return model
+            except Exception as e:
+                import traceback
+                print(f"❌ Error loading cached model: {str(e)}")
+                print(f"Traceback: {traceback.format_exc()}")
+                print("Re-downloading model from Firebase Storage...")
+
+        print(f"Loading model from Firebase Storage: {MODEL_STORAGE_PATH}")
+
         # Import firebase_admin saat diperlukan (lazy import)
         from firebase_admin import initialize_app, storage, get_app
 
@@ -65,39 +271,46 @@ def load_model_from_firebase_storage():
         # List semua file di folder model
         blobs = list(bucket.list_blobs(prefix=MODEL_STORAGE_PATH))
 
-        if not blobs or all(blob.name.endswith('/') for blob in blobs):
+        # Skip folder (blob.name ends with /)
+        blobs = [blob for blob in blobs if not blob.name.endswith('/')]
+
+        if not blobs:
             raise FileNotFoundError(f"Model tidak ditemukan di Firebase Storage: {MODEL_STORAGE_PATH}")
 
+        # Download hanya file yang dibutuhkan BACKEND; jika file BACKEND tidak ada di Storage,
+        # download model torch (create_sentence_transformer fallback ke backend torch)
+        backend_file = BACKEND_MODEL_FILES.get(BACKEND)
+        if backend_file not in {get_relative_path(blob) for blob in blobs}:
+            backend_file = None
+        blobs = [blob for blob in blobs if is_model_file_needed(get_relative_path(blob), backend_file)]
+
+        # Hapus sentinel lama supaya .complete hanya menandai download yang sedang berjalan ini selesai
+        if os.path.exists(LOCAL_MODEL_COMPLETE_FILE):
+            os.remove(LOCAL_MODEL_COMPLETE_FILE)
+
         # Create local directory
         os.makedirs(LOCAL_MODEL_PATH, exist_ok=True)
 
-        # Download setiap file
+        # Download semua file secara paralel
         downloaded_files = []
-        for blob in blobs:
-            # Skip jika ini folder (blob.name ends with /)
-            if blob.name.endswith('/'):
-                continue
-
-            # Get relative path dari MODEL_STORAGE_PATH
-            relative_path = blob.name.replace(MODEL_STORAGE_PATH + "/", "")
-            local_file_path = os.path.join(LOCAL_MODEL_PATH, relative_path)
-
-            # Create directory jika perlu
-            os.makedirs(os.path.dirname(local_file_path), exist_ok=True)
-
-            # Download file
-            blob.download_to_filename(local_file_path)
-            downloaded_files.append(blob.name)
-            print(f"  ✅ Downloaded: {blob.name}")
+        with ThreadPoolExecutor(max_workers=DOWNLOAD_MAX_WORKERS) as executor:
+            futures = [executor.submit(download_blob, blob) for blob in blobs]
+            for future in as_completed(futures):
+                blob_name = future.result()
+                downloaded_files.append(blob_name)
+                print(f"  ✅ Downloaded: {blob_name}")
 
         print(f"Downloaded {len(downloaded_files)} files from Firebase Storage")
 
-        # Import SentenceTransformer saat diperlukan (lazy import)
-        from sentence_transformers import SentenceTransformer
+        # Tandai download sudah lengkap supaya bisa dipakai ulang tanpa download ulang
+        with open(LOCAL_MODEL_COMPLETE_FILE, "w") as f:
+            f.write(MODEL_STORAGE_PATH)
 
         # Load model dari local path
-        model = SentenceTransformer(LOCAL_MODEL_PATH)
+        model = create_sentence_transformer(LOCAL_MODEL_PATH)
         _model_loaded = True
+        _model_version = MODEL_STORAGE_PATH
+        _model_source = "storage"
         print(f"✅ Model loaded from Firebase Storage successfully!")
 
         return model
@@ -113,9 +326,13 @@ def load_model_from_firebase_storage():
             # Import SentenceTransformer saat diperlukan (lazy import)
             from sentence_transformers import SentenceTransformer
 
+            configure_torch_threads()
+
             # Fallback ke pre-trained model
-            model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+            model = apply_bf16(SentenceTransformer(FALLBACK_MODEL_NAME))
             _model_loaded = True
+            _model_version = FALLBACK_MODEL_NAME
+            _model_source = "fallback"
             print("✅ Fallback model loaded successfully")
             return model
         except Exception as fallback_error:
@@ -123,51 +340,148 @@ def load_model_from_firebase_storage():
             raise fallback_error
 
 
-# Model akan di-load secara lazy saat function pertama kali dipanggil
-# Tidak di-load saat deployment untuk avoid timeout
-# model = load_model_from_firebase_storage()  # Commented out untuk avoid deployment timeout
+# Model di-load secara lazy saat function pertama kali dipanggil (lihat encode_texts),
+# tidak di-load saat module di-import untuk avoid deployment timeout
 
 
-def calculate_similarity(key_answer: str, student_answer: str) -> float:
+def get_model():
+    """Load model sekali per instance (thread-safe) dan return model yang sudah loaded."""
+    global model
+    if model is None:
+        with _model_lock:
+            if model is None:
+                print("Model belum loaded, loading sekarang...")
+                model = load_model_from_firebase_storage()
+    return model
+
+
+def encode_texts(texts: list):
     """
-    Hitung cosine similarity antara key_answer dan student_answer
-    menggunakan sentence embeddings dari model fine-tuned.
+    Encode list teks menjadi normalized embeddings dalam satu panggilan model.encode.
 
-    Logic ini sama dengan yang digunakan di notebook finetuning-model.ipynb:
-    1. Encode kedua teks menjadi embeddings menggunakan SentenceTransformer
-    2. Hitung cosine similarity menggunakan util.cos_sim
+    SentenceTransformer.encode sudah mengurutkan teks berdasarkan panjangnya sebelum
+    dibagi ke batch (dan mengembalikan hasil sesuai urutan input), jadi teks harus
+    dikirim sekaligus, bukan per pasangan, dan tidak perlu di-tokenize manual.
+
+    Embeddings disimpan di LRU cache dengan key (_model_version, SHA-256 teks),
+    sehingga hanya teks yang belum pernah di-encode yang masuk ke model.encode.
+    Cache hit juga melewati tokenizer, jadi tidak perlu cache terpisah untuk hasil tokenize.
 
     Returns:
-        float: Similarity score antara 0.0 - 1.0
+        np.ndarray: Embeddings dengan urutan yang sama seperti texts
     """
-    try:
-        if not key_answer or not student_answer:
-            return 0.0
+    # Import numpy saat diperlukan (lazy import)
+    import numpy as np
 
-        # Pastikan model sudah loaded
-        global model
-        if model is None:
-            print("Model belum loaded, loading sekarang...")
-            model = load_model_from_firebase_storage()
+    model = get_model()
 
-        # Encode kedua teks menjadi embeddings
-        # Sama seperti di notebook: model.encode([text1, text2], convert_to_tensor=True)
-        embeddings = model.encode([key_answer, student_answer], convert_to_tensor=True)
+    cache_keys = [(_model_version, hashlib.sha256(text.encode("utf-8")).digest()) for text in texts]
 
-        # Import util saat diperlukan (lazy import)
-        from sentence_transformers import util
+    found_embeddings = {}
+    missing_texts = {}
+    with _embedding_cache_lock:
+        for text, cache_key in zip(texts, cache_keys):
+            if cache_key in _embedding_cache:
+                _embedding_cache.move_to_end(cache_key)
+                found_embeddings[cache_key] = _embedding_cache[cache_key]
+            else:
+                missing_texts.setdefault(cache_key, text)
+
+    if missing_texts:
+        with _encode_lock:
+            missing_embeddings = model.encode(
+                list(missing_texts.values()),
+                batch_size=ENCODE_BATCH_SIZE,
+                convert_to_numpy=True,
+                normalize_embeddings=True
+            )
+        # Copy setiap baris supaya cache tidak menyimpan view yang menahan seluruh array batch
+        found_embeddings.update(
+            (cache_key, embedding.copy()) for cache_key, embedding in zip(missing_texts, missing_embeddings)
+        )
+
+        with _embedding_cache_lock:
+            for cache_key in missing_texts:
+                _embedding_cache[cache_key] = found_embeddings[cache_key]
+
+            # Buang embeddings yang paling lama tidak dipakai
+            while len(_embedding_cache) > EMBEDDING_CACHE_SIZE:
+                _embedding_cache.popitem(last=False)
+
+    return np.stack([found_embeddings[cache_key] for cache_key in cache_keys])
+
+
+# Desain batching: semua scoring harus lewat score_batch, yang meng-encode seluruh teks
+# dalam satu panggilan model.encode. Encode per pasangan (batch=1, 2 teks per panggilan)
+# didominasi overhead Python/dispatch dan tidak memanfaatkan throughput GEMM, dan semua
+# optimasi model (smart batching, cache embeddings, backend INT8) bergantung pada ini.
+# Jangan kembali memanggil model.encode per soal di score_exam.
+def score_batch(pairs: list) -> list:
+    """
+    Hitung cosine similarity untuk banyak pasangan (key_answer, student_answer) sekaligus
+    menggunakan sentence embeddings dari model fine-tuned.
 
-        # Hitung cosine similarity
-        # Sama seperti di notebook: util.cos_sim(embeddings[0], embeddings[1])
-        similarity = util.cos_sim(embeddings[0], embeddings[1])
+    Logic ini sama dengan yang digunakan di notebook finetuning-model.ipynb:
+    1. Encode semua teks menjadi embeddings menggunakan SentenceTransformer
+    2. Hitung cosine similarity (dot product dari normalized embeddings,
+       hasilnya sama dengan util.cos_sim di notebook)
 
-        return float(similarity.item())
+    Args:
+        pairs: List tuple (key_answer, student_answer)
+
+    Returns:
+        list: Similarity score (0.0 - 1.0) untuk setiap pasangan, dalam urutan yang sama.
+              Pasangan dengan teks kosong bernilai 0.0
+    """
+    # Teks yang sama (misalnya key_answer yang berulang) hanya di-encode sekali
+    texts = []
+    text_indices = {}
+    key_indices = []
+    student_indices = []
+    pair_positions = []
+    for position, (key_answer, student_answer) in enumerate(pairs):
+        if not key_answer or not student_answer:
+            continue
+        for text in (key_answer, student_answer):
+            if text not in text_indices:
+                text_indices[text] = len(texts)
+                texts.append(text)
+        key_indices.append(text_indices[key_answer])
+        student_indices.append(text_indices[student_answer])
+        pair_positions.append(position)
+
+    similarities = [0.0] * len(pairs)
+    if not pair_positions:
+        return similarities
+
+    try:
+        embeddings = encode_texts(texts)
+
+        # Embeddings sudah dinormalisasi, jadi cosine similarity = dot product
+        pair_similarities = (embeddings[key_indices] * embeddings[student_indices]).sum(axis=1).tolist()
+        for position, similarity in zip(pair_positions, pair_similarities):
+            similarities[position] = similarity
     except Exception as e:
         import traceback
-        print(f"❌ Error in calculate_similarity: {str(e)}")
+        print(f"❌ Error in score_batch: {str(e)}")
         print(f"Traceback: {traceback.format_exc()}")
-        # Return 0.0 jika ada error
-        return 0.0
+        # Return 0.0 untuk semua pasangan jika ada error
+
+    return similarities
+
+
+def calculate_similarity(key_answer: str, student_answer: str) -> float:
+    """
+    Hitung cosine similarity antara satu key_answer dan student_answer.
+
+    Hanya untuk pemakaian satu pasangan; untuk banyak jawaban gunakan score_batch
+    supaya semua teks di-encode dalam satu batch.
+
+    Returns:
+        float: Similarity score antara 0.0 - 1.0
+    """
+    print("⚠️ calculate_similarity dipanggil untuk satu pasangan, gunakan score_batch untuk banyak jawaban")
+    return score_batch([(key_answer, student_answer)])[0]
 
 
 def calculate_final_score(similarity: float, max_score: int) -> int:
@@ -192,29 +506,50 @@ def calculate_final_score(similarity: float, max_score: int) -> int:
     Returns:
         int: Final score (0 - max_score)
     """
-    if similarity >= 0.85:
-        # Perfect answers: 90-100% of max_score
-        percentage = 0.90 + (similarity - 0.85) * 0.67  # Maps 0.85-1.0 to 0.90-1.0
-    elif similarity >= 0.70:
-        # Good answers: 70-89% of max_score
-        percentage = 0.70 + (similarity - 0.70) * 1.33  # Maps 0.70-0.85 to 0.70-0.90
-    elif similarity >= 0.55:
-        # Partial answers: 50-69% of max_score
-        percentage = 0.50 + (similarity - 0.55) * 1.33  # Maps 0.55-0.70 to 0.50-0.70
-    elif similarity >= 0.40:
-        # Weak answers: 30-49% of max_score
-        percentage = 0.30 + (similarity - 0.40) * 1.33  # Maps 0.40-0.55 to 0.30-0.50
-    else:
-        # Poor/Irrelevant answers: 0-29% of max_score
-        percentage = similarity * 0.75  # Maps 0.0-0.40 to 0.0-0.30
+    return calculate_final_scores([similarity], [max_score])[0]
+
 
-    return round(min(percentage, 1.0) * max_score)
+def calculate_final_scores(similarities: list, max_scores: list) -> list:
+    """
+    Versi vectorized dari calculate_final_score untuk seluruh jawaban exam sekaligus.
+    Scaling strategy sama persis dengan calculate_final_score.
+
+    Args:
+        similarities: List cosine similarity score dari model (0.0 - 1.0)
+        max_scores: List maximum score untuk setiap pertanyaan
+
+    Returns:
+        list: Final score (0 - max_score) untuk setiap jawaban, dalam urutan yang sama
+    """
+    # Import numpy saat diperlukan (lazy import)
+    import numpy as np
+
+    similarities = np.asarray(similarities, dtype=np.float64)
+    max_scores = np.asarray(max_scores, dtype=np.float64)
+
+    conditions = [
+        similarities >= 0.85,  # Perfect answers: 90-100% of max_score
+        similarities >= 0.70,  # Good answers: 70-89% of max_score
+        similarities >= 0.55,  # Partial answers: 50-69% of max_score
+        similarities >= 0.40,  # Weak answers: 30-49% of max_score
+    ]
+    percentages = [
+        0.90 + (similarities - 0.85) * 0.67,  # Maps 0.85-1.0 to 0.90-1.0
+        0.70 + (similarities - 0.70) * 1.33,  # Maps 0.70-0.85 to 0.70-0.90
+        0.50 + (similarities - 0.55) * 1.33,  # Maps 0.55-0.70 to 0.50-0.70
+        0.30 + (similarities - 0.40) * 1.33,  # Maps 0.40-0.55 to 0.30-0.50
+    ]
+    # Poor/Irrelevant answers: 0-29% of max_score, maps 0.0-0.40 to 0.0-0.30
+    percentage = np.select(conditions, percentages, default=similarities * 0.75)
+
+    # np.round memakai round-half-to-even, sama seperti round() Python
+    return np.round(np.minimum(percentage, 1.0) * max_scores).astype(int).tolist()
 
 
 def create_response(data: dict, status: int = 200) -> https_fn.Response:
     """Helper untuk membuat response dengan CORS headers."""
     return https_fn.Response(
-        json.dumps(data),
+        orjson.dumps(data),
         status=status,
         headers={
             "Content-Type": "application/json",
@@ -228,10 +563,11 @@ def create_response(data: dict, status: int = 200) -> https_fn.Response:
 # Function score_essay dihapus karena tidak digunakan
 # Hanya score_exam yang digunakan oleh Next.js
 
-@https_fn.on_request(memory=1024, timeout_sec=120, cors=True)
+@https_fn.on_request(memory=2048, cpu=2, timeout_sec=120, cors=True, min_instances=1, concurrency=20)
 def score_exam(req: https_fn.Request) -> https_fn.Response:
     """
     HTTP Cloud Function untuk scoring seluruh exam sekaligus.
+    Request ke path /warmup hanya me-load model (dipanggil oleh warm_score_exam).
 
     Input JSON:
     {
@@ -269,6 +605,21 @@ def score_exam(req: https_fn.Request) -> https_fn.Response:
             print("✅ OPTIONS request - returning CORS headers")
             return create_response({}, 204)
 
+        if req.path.rstrip("/").endswith("/warmup"):
+            # Load model supaya tetap resident di instance ini; error tidak di-swallow
+            # supaya kegagalan load terlihat di log scheduler
+            try:
+                get_model()
+            except Exception as e:
+                import traceback
+                print(f"❌ Warmup failed: {str(e)}")
+                print(f"Traceback: {traceback.format_exc()}")
+                return create_response({"error": f"Model load error: {str(e)}", "status": "error"}, 500)
+
+            # Path model hanya di log; response hanya berisi label sumber model
+            print(f"✅ Warmup request - model loaded: {_model_version}")
+            return create_response({"status": "warm", "model": _model_source})
+
         if req.method != "POST":
             print(f"❌ Invalid method: {req.method}")
             return create_response({"error": "Method not allowed", "status": "error"}, 405)
@@ -295,18 +646,19 @@ def score_exam(req: https_fn.Request) -> https_fn.Response:
         total_score = 0
         total_max_score = 0
 
-        for answer in answers:
+        # Semua jawaban di-score dalam satu batch (lihat score_batch)
+        # Jawaban kosong (student_answer atau key_answer) memiliki similarity 0.0 -> final score 0
+        similarity_scores = score_batch([
+            (answer.get("key_answer", "").strip(), answer.get("student_answer", "").strip())
+            for answer in answers
+        ])
+        max_scores = [answer.get("max_score", 100) for answer in answers]
+        final_scores = calculate_final_scores(similarity_scores, max_scores)
+
+        for answer, similarity_score, max_score, final_score in zip(
+            answers, similarity_scores, max_scores, final_scores
+        ):
             question_id = answer.get("question_id", "")
-            key_answer = answer.get("key_answer", "").strip()
-            student_answer = answer.get("student_answer", "").strip()
-            max_score = answer.get("max_score", 100)
-
-            if not student_answer:
-                similarity_score = 0.0
-                final_score = 0
-            else:
-                similarity_score = calculate_similarity(key_answer, student_answer)
-                final_score = calculate_final_score(similarity_score, max_score)
 
             results.append({
                 "question_id": question_id,
@@ -336,3 +688,21 @@ def score_exam(req: https_fn.Request) -> https_fn.Response:
             "status": "error",
             "details": error_traceback if "DEBUG" in os.environ else None
         }, 500)
+
+
+@scheduler_fn.on_schedule(schedule="every 5 minutes", timeout_sec=120)
+def warm_score_exam(event: scheduler_fn.ScheduledEvent) -> None:
+    """
+    Scheduled function yang memanggil score_exam /warmup setiap 5 menit
+    supaya instance score_exam (min_instances=1) selalu memiliki model di memory.
+    """
+    if not SCORE_EXAM_URL:
+        print("⚠️ SCORE_EXAM_URL belum di-set, skip warmup")
+        return
+
+    warmup_url = SCORE_EXAM_URL.rstrip("/") + "/warmup"
+    try:
+        with urllib.request.urlopen(warmup_url, timeout=110) as response:
+            print(f"✅ Warmup {warmup_url}: status={response.status}")
+    except Exception as e:
+        print(f"❌ Error warming up score_exam: {str(e)}")
@@ -0,0 +1,96 @@
+"""
+Script untuk export model fine-tuned ke OpenVINO dan ONNX dengan quantization INT8
+Jalankan sebelum upload_model_to_storage_firebase.py supaya folder openvino/ dan onnx/ ikut di-upload
+Membutuhkan sentence-transformers>=3.3.0 (export_static_quantized_openvino_model)
+"""
+
+import sys
+from pathlib import Path
+
+# Configuration
+MODEL_DIR = Path(__file__).parent.parent / "finsmart-ai-finetuned-model"
+ONNX_QUANTIZATION_CONFIG = "avx512_vnni"  # Menghasilkan onnx/model_qint8_avx512_vnni.onnx
+
+# Calibration dataset untuk OpenVINO static quantization: jawaban dari dataset training (in-domain)
+# Folder dataset/ di-load sebagai CSV dataset (config "default"), split "train" = financial_literacy_train.csv
+CALIBRATION_DATASET_DIR = Path(__file__).parent.parent / "dataset"
+CALIBRATION_DATASET_CONFIG = "default"
+CALIBRATION_DATASET_SPLIT = "train"
+CALIBRATION_COLUMN = "student_answer"
+CALIBRATION_NUM_SAMPLES = 100  # Jumlah baris di financial_literacy_train.csv
+
+
+def export_model_to_openvino():
+    """Export model ke openvino/openvino_model.xml lalu quantize ke openvino/openvino_model_qint8_quantized.xml"""
+    from sentence_transformers import SentenceTransformer, export_static_quantized_openvino_model
+    from optimum.intel import OVQuantizationConfig
+
+    print(f"📦 Exporting model to OpenVINO: {MODEL_DIR}")
+
+    # backend="openvino" akan export model torch ke OpenVINO secara otomatis jika belum ada
+    model = SentenceTransformer(str(MODEL_DIR), backend="openvino")
+    model.save_pretrained(str(MODEL_DIR))
+    print("   ✓ Exported: openvino/openvino_model.xml")
+
+    # Static quantization membutuhkan calibration dataset, gunakan jawaban financial literacy
+    # (bukan default glue/sst2) supaya range aktivasi sesuai dengan teks production
+    export_static_quantized_openvino_model(
+        model,
+        OVQuantizationConfig(num_samples=CALIBRATION_NUM_SAMPLES),
+        str(MODEL_DIR),
+        dataset_name=str(CALIBRATION_DATASET_DIR),
+        dataset_config_name=CALIBRATION_DATASET_CONFIG,
+        dataset_split=CALIBRATION_DATASET_SPLIT,
+        column_name=CALIBRATION_COLUMN,
+    )
+    print("   ✓ Quantized: openvino/openvino_model_qint8_quantized.xml")
+
+
+def export_model_to_onnx():
+    """Export model ke onnx/model.onnx lalu quantize ke onnx/model_qint8_avx512_vnni.onnx"""
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    print(f"📦 Exporting model to ONNX: {MODEL_DIR}")
+
+    # backend="onnx" akan export model torch ke ONNX secara otomatis jika belum ada
+    model = SentenceTransformer(str(MODEL_DIR), backend="onnx")
+    model.save_pretrained(str(MODEL_DIR))
+    print("   ✓ Exported: onnx/model.onnx")
+
+    export_dynamic_quantized_onnx_model(model, ONNX_QUANTIZATION_CONFIG, str(MODEL_DIR))
+    print(f"   ✓ Quantized: onnx/model_qint8_{ONNX_QUANTIZATION_CONFIG}.onnx")
+
+
+def export_model_backends():
+    """Export model ke semua backend yang didukung Cloud Function"""
+    if not MODEL_DIR.exists():
+        print(f"❌ Error: Model directory tidak ditemukan: {MODEL_DIR}")
+        return False
+
+    # Setiap backend di-export terpisah supaya kegagalan satu backend tidak menghentikan yang lain
+    exporters = {
+        "OpenVINO": export_model_to_openvino,
+        "ONNX": export_model_to_onnx,
+    }
+    failed_backends = []
+    for backend_name, export_fn in exporters.items():
+        try:
+            export_fn()
+        except Exception as e:
+            print(f"❌ Error exporting {backend_name}: {str(e)}")
+            failed_backends.append(backend_name)
+
+    if failed_backends:
+        print(f"\n❌ Export gagal untuk: {', '.join(failed_backends)}")
+        print("\n💡 Pastikan dependencies export terinstall:")
+        print("   pip install \"sentence-transformers[onnx,openvino]>=3.3.0\" \"optimum-intel[openvino,nncf]\" datasets")
+        return False
+
+    print("\n✅ Export selesai!")
+    print("📝 Jalankan ulang evaluasi di notebook untuk memastikan threshold calculate_final_score masih sesuai")
+    return True
+
+
+if __name__ == "__main__":
+    success = export_model_backends()
+    sys.exit(0 if success else 1)